@@ -41,16 +41,7 @@ v4 = input("Variable name: ")
 l4 = float(input("Expand at " + v4 + " = "))
 t4 = tokenize(e4)
 p4 = parse(t4)
-seq = ""
-px = 0
-
-for c in taylor(p4, n4, l4, v4):
-    seq += str(c) + "*(" + v4 + '-' + str(l4) + ")^" + str(px) + '+'
-    px += 1
-
-seq += "O((" + v4 + '-' + str(l4) + ")^" + str(n4) + ')'
-
-print("The required Taylor series expansion is", seq)
+print("The required Taylor series expansion is", taylor(p4, n4, l4, v4))
 
 print()
 
@@ -14,6 +14,7 @@ limit - computes the limit of a function at a point
 import sys
 from symbolic.parser import *
 from symbolic.symb.manip import * 
+from symbolic.diff.series import TaylorSeries
 
 def diff(expr, var = 'x'):
     """
@@ -87,7 +88,7 @@ def taylor(expr, terms = 4, pos = 0.0, var = 'x'):
     var(string) - name of variable ('x' by default)
 
     Return:
-    list of floats [c0, c1, c2, ...] such that expr = c0 + c1 (x-a) + c2(x-a)^2 + ...
+    TaylorSeries with coefficients [c0, c1, c2, ...] such that expr = c0 + c1 (x-a) + c2(x-a)^2 + ...
     """
 
     n = 0 # term number
@@ -100,7 +101,7 @@ def taylor(expr, terms = 4, pos = 0.0, var = 'x'):
         nfact *= (n+1)  
         nderiv = diff(nderiv, var)
 
-    return coeffs
+    return TaylorSeries(coeffs, pos, var)
 
 def limit(expr, pos = 0.0, var = 'x'):
     """
@@ -0,0 +1,245 @@
+"""
+Package: symbolic.diff
+Provides a module for symbolic treatment of calculus
+
+Module: series.py
+Provides a result type for truncated power series
+
+Classes:
+TaylorSeries - truncated Taylor series with numeric coefficients
+"""
+
+from array import array
+from numbers import Real
+from io import StringIO
+from math import isclose
+from symbolic.symb.manip import write_infix
+
+def _mul(a, b, n):
+    """
+    Multiplies two coefficient sequences, keeping the first n coefficients of the product
+    """
+
+    prod = [0.0] * n
+
+    for i in range(min(len(a), n)):
+        if a[i] == 0.0:
+            continue
+
+        for j in range(min(len(b), n - i)):
+            prod[i + j] += a[i] * b[j]
+
+    return prod
+
+class TaylorSeries:
+    """
+    Class: symbolic.diff.series.TaylorSeries
+    Truncated Taylor series c0 + c1 (x-a) + c2 (x-a)^2 + ... + O((x-a)^order)
+
+    Arithmetic works on the coefficients directly, without differentiating again. Combining
+    series gives the lowest order of the operands; combining series expanded at different points
+    raises ValueError. Like the list taylor used to return, the series can be iterated, indexed
+    and measured with len, but slices are arrays and it only compares equal to other series.
+
+    Attributes:
+    coeffs(array of floats) - coefficients [c0, c1, c2, ...]
+    pos(float) - point of expansion a
+    var(string) - name of variable
+    """
+
+    __array_ufunc__ = None # make NumPy scalars and arrays defer to the operators below
+
+    def __init__(self, coeffs, pos = 0.0, var = 'x'):
+        """
+        Parameters:
+        coeffs(list of floats) - coefficients [c0, c1, c2, ...]; the order is their number
+        pos(float) - point of expansion (0.0 by default)
+        var(string) - name of variable ('x' by default)
+        """
+
+        self.coeffs = array('d', coeffs)
+        self.pos = float(pos)
+        self.var = var
+
+    @property
+    def order(self):
+        """
+        Power of (x-a) in the truncation error
+        """
+
+        return len(self.coeffs)
+
+    def __len__(self):
+        return len(self.coeffs)
+
+    def __getitem__(self, k):
+        return self.coeffs[k]
+
+    def __iter__(self):
+        return iter(self.coeffs)
+
+    def __eq__(self, other):
+        if not isinstance(other, TaylorSeries):
+            return NotImplemented
+
+        return self.coeffs == other.coeffs and self.pos == other.pos and self.var == other.var
+
+    def __repr__(self):
+        return 'TaylorSeries(' + str(list(self.coeffs)) + ', ' + repr(self.pos) + ', ' + repr(self.var) + ')'
+
+    def __call__(self, x):
+        """
+        Evaluates the series by Horner's method
+
+        Parameters:
+        x(float or NumPy array) - point(s) of evaluation
+
+        Return:
+        Value(s) of the truncated series
+        """
+
+        dx = x - self.pos
+        val = 0.0
+
+        for c in reversed(self.coeffs):
+            val = val * dx + c
+
+        return val
+
+    def _check_compatible(self, other):
+        """
+        Raises ValueError unless other is expanded in the same variable at the same point
+        """
+
+        if other.pos != self.pos or other.var != self.var:
+            raise ValueError("Series expanded at different points")
+
+    def __add__(self, other):
+        if isinstance(other, Real):
+            coeffs = list(self.coeffs)
+
+            if coeffs != []:
+                coeffs[0] += other
+
+            return TaylorSeries(coeffs, self.pos, self.var)
+        elif not isinstance(other, TaylorSeries):
+            return NotImplemented
+
+        self._check_compatible(other)
+
+        n = min(self.order, other.order)
+        return TaylorSeries([self.coeffs[k] + other.coeffs[k] for k in range(n)], self.pos, self.var)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return TaylorSeries([-c for c in self.coeffs], self.pos, self.var)
+
+    def __sub__(self, other):
+        if not isinstance(other, (Real, TaylorSeries)):
+            return NotImplemented
+
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, Real):
+            return TaylorSeries([c * other for c in self.coeffs], self.pos, self.var)
+        elif not isinstance(other, TaylorSeries):
+            return NotImplemented
+
+        self._check_compatible(other)
+
+        n = min(self.order, other.order)
+        return TaylorSeries(_mul(self.coeffs, other.coeffs, n), self.pos, self.var)
+
+    __rmul__ = __mul__
+
+    def truncate(self, order):
+        """
+        Returns the series truncated to the given order
+
+        Parameters:
+        order(int) - new order, at most the current one
+        """
+
+        return TaylorSeries(self.coeffs[:order], self.pos, self.var)
+
+    def compose(self, inner):
+        """
+        Composes the series with an inner series g, giving the series of f(g(x))
+
+        Parameters:
+        inner(TaylorSeries) - series of g, whose constant term must be the expansion point of this series
+
+        Return:
+        The series of f(g(x)), expanded where inner is; raises ValueError if the points do not match
+        """
+
+        if inner.order == 0 or not isclose(inner.coeffs[0], self.pos, abs_tol = 1e-6): # evaluate rounds to 6 places
+            raise ValueError("Inner series does not start at the point of expansion")
+
+        n = min(self.order, inner.order)
+        h = [0.0] + list(inner.coeffs[1:n]) # g - g(a), which has no constant term
+        comp = [0.0] * n
+
+        for c in reversed(self.coeffs[:n]): # Horner's method with series arithmetic
+            comp = _mul(comp, h, n)
+            comp[0] += c
+
+        return TaylorSeries(comp, inner.pos, inner.var)
+
+    def _shift(self):
+        """
+        Returns the parse tree of x-a
+        """
+
+        dx = ('var', self.var)
+
+        if self.pos > 0:
+            return (('op', '-'), dx, ('val', self.pos))
+        elif self.pos < 0:
+            return (('op', '+'), dx, ('val', -self.pos))
+
+        return dx
+
+    def to_tree(self):
+        """
+        Converts the series, without its error term, into a parse tree
+
+        Return:
+        Parse tree of c0 + c1 (x-a) + c2 (x-a)^2 + ..., leaving out zero terms
+        """
+
+        dx = self._shift() # shared by all terms, so the tree has linear size
+        tree = None
+
+        for k, c in enumerate(self.coeffs):
+            if c == 0.0:
+                continue
+
+            if k == 0: # kept negative, which is what parse makes of a negated number
+                tree = ('val', c)
+                continue
+
+            term = dx if k == 1 else (('op', '^'), dx, ('val', float(k)))
+
+            if abs(c) != 1.0:
+                term = (('op', '*'), ('val', abs(c)), term)
+
+            if tree is None:
+                tree = term if c > 0 else (('fn', '-'), term)
+            else:
+                tree = (('op', '+' if c > 0 else '-'), tree, term)
+
+        return tree if tree is not None else ('val', 0.0)
+
+    def __str__(self):
+        buf = StringIO()
+        write_infix(self.to_tree(), buf)
+        buf.write(' + O(')
+        write_infix((('op', '^'), self._shift(), ('val', float(self.order))), buf)
+        buf.write(')')
+        return buf.getvalue()
@@ -0,0 +1,254 @@
+"""
+Package: symbolic.num
+Provides modules for fast numeric evaluation of parse trees over many points
+
+Module: parallel.py
+Provides evaluation of parse trees over huge arrays on several cores, with the data kept in shared memory
+
+Classes:
+SharedArray - NumPy array backed by a multiprocessing.shared_memory block
+
+Functions:
+parallel_evaluate - evaluates a parse tree over shared arrays using a process pool
+benchmark         - measures the scaling of parallel_evaluate with the number of workers
+"""
+
+import os
+import sys
+import time
+import numpy as np
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from symbolic.parser import *
+from symbolic.num.vector import *
+
+class SharedArray:
+    """
+    Class: symbolic.num.parallel.SharedArray
+    NumPy array backed by a multiprocessing.shared_memory block
+
+    Other processes attach to the same block by name (see spec), so the data itself is never pickled
+
+    Attributes:
+    shm(SharedMemory) - underlying shared memory block
+    array(numpy array) - view of the block
+    owner(bool) - True if this object created the block and should unlink it
+    """
+
+    def __init__(self, shape, dtype = 'float64', name = None):
+        """
+        Creates a new shared array, or attaches to an existing block if name is given
+
+        Parameters:
+        shape(tuple of ints) - shape of the array
+        dtype(NumPy dtype) - element type ('float64' by default)
+        name(string) - name of an existing block to attach to (None by default)
+        """
+
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize) # blocks cannot be empty
+
+        self.owner = name is None
+        self.shm = SharedMemory(name = name, create = self.owner, size = size if self.owner else 0)
+        self.array = np.ndarray(shape, dtype = dtype, buffer = self.shm.buf)
+
+    @classmethod
+    def copy_of(cls, arr):
+        """
+        Creates a shared array holding a copy of arr
+
+        Parameters:
+        arr(array-like) - data to copy
+
+        Return:
+        A new SharedArray
+        """
+
+        arr = np.asarray(arr)
+        shared = cls(arr.shape, arr.dtype)
+        shared.array[...] = arr
+
+        return shared
+
+    def spec(self):
+        """
+        Return:
+        (name, shape, dtype) tuple from which SharedArray(shape, dtype, name) attaches to the same block
+        """
+
+        return (self.shm.name, self.array.shape, self.array.dtype.str)
+
+    def close(self):
+        """
+        Detaches from the block, and frees it if this object created it
+        """
+
+        self.array = None
+        self.shm.close()
+
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_worker = {} # per-process state of pool workers: compiled function and attached arrays
+
+def _init_worker(tree, var_names, in_specs, out_spec):
+    """
+    Pool initializer: compiles the tree once and attaches to the shared input and output arrays
+    """
+
+    _worker['fn'] = compile_tree(tree, var_names)
+    _worker['ins'] = [SharedArray(shape, dtype, name) for name, shape, dtype in in_specs]
+    _worker['out'] = SharedArray(out_spec[1], out_spec[2], out_spec[0])
+
+def _eval_chunk(bounds):
+    """
+    Evaluates the compiled function on the flat index range bounds = (start, stop) and writes it to the output
+    """
+
+    start, stop = bounds
+    args = [a.array.reshape(-1)[start:stop] for a in _worker['ins']]
+    _worker['out'].array.reshape(-1)[start:stop] = _worker['fn'](*args)
+
+    return stop - start
+
+def parallel_evaluate(tree, inputs, out = None, chunk_size = 1 << 20, workers = None):
+    """
+    Function: symbolic.num.parallel.parallel_evaluate
+    Evaluates a parse tree over shared arrays using a process pool
+
+    The flat index range is split into chunks which are handed out to the workers. Each worker
+    compiles the tree once with compile_tree, and reads its inputs from and writes its results to
+    shared memory directly, so only the chunk bounds travel between processes.
+
+    Parameters:
+    tree(parse tree) - expression to evaluate
+    inputs(dict) - maps each variable name to a SharedArray; all arrays must have the same shape
+    out(SharedArray) - float64 array to write the results to (None by default, to create a new one; required if inputs is empty)
+    chunk_size(int) - number of points per task (2^20 by default)
+    workers(int) - number of worker processes (os.cpu_count() by default); 1 evaluates in this process
+
+    Return:
+    The output SharedArray, or None if the expression or the arrays are unsuitable
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if chunk_size < 1 or workers < 1:
+        print("Chunk size and number of workers must be positive", file = sys.stderr)
+        return None
+
+    var_names = list(inputs.keys())
+    shapes = set(a.array.shape for a in inputs.values())
+
+    if out is not None:
+        if out.array.dtype != np.float64:
+            print("Output array must be float64", file = sys.stderr)
+            return None
+
+        shapes.add(out.array.shape)
+
+    if len(shapes) == 0: # a constant expression has no inputs to take the shape from
+        print("Output array required without inputs", file = sys.stderr)
+        return None
+    elif len(shapes) != 1:
+        print("Mismatched array shapes", file = sys.stderr)
+        return None
+
+    fn = compile_tree(tree, var_names) # also checks that the tree can be compiled before starting workers
+
+    if fn is None:
+        return None
+
+    created = out is None # a block created here is freed again if evaluation fails
+
+    if created:
+        out = SharedArray(shapes.pop())
+
+    try:
+        size = out.array.size
+        chunks = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+        if workers == 1 or len(chunks) <= 1:
+            flat = out.array.reshape(-1)
+
+            for start, stop in chunks:
+                flat[start:stop] = fn(*[a.array.reshape(-1)[start:stop] for a in inputs.values()])
+
+            return out
+
+        in_specs = [a.spec() for a in inputs.values()]
+
+        with Pool(min(workers, len(chunks)), _init_worker, (tree, var_names, in_specs, out.spec())) as pool:
+            for _ in pool.imap_unordered(_eval_chunk, chunks):
+                pass
+
+    except BaseException:
+        if created:
+            out.close()
+
+        raise
+
+    return out
+
+def benchmark(expr = 'sin(x)^2 + log(1 + x^2) * exp(-x / 10)', size = 10 ** 7, chunk_size = 1 << 20, max_workers = None, repeat = 3):
+    """
+    Function: symbolic.num.parallel.benchmark
+    Measures the scaling of parallel_evaluate with the number of workers, and prints a table of the results
+
+    Times include starting the pool, as in real use. Efficiency is speedup divided by the number of workers.
+
+    Parameters:
+    expr(string) - infix expression in x to evaluate
+    size(int) - number of points (10^7 by default)
+    chunk_size(int) - number of points per task (2^20 by default)
+    max_workers(int) - largest number of workers to try (os.cpu_count() by default)
+    repeat(int) - number of runs per worker count, of which the fastest is kept (3 by default)
+
+    Return:
+    List of (workers, seconds, speedup, efficiency) tuples
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    counts = [1]
+
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+
+    if max_workers > 1:
+        counts.append(max_workers)
+
+    tree = parse(tokenize(expr))
+    results = []
+
+    with SharedArray.copy_of(np.linspace(-100.0, 100.0, size)) as x, SharedArray((size,)) as out:
+        print("Evaluating", expr, "at", size, "points")
+        print("workers   seconds   speedup   efficiency")
+
+        for workers in counts:
+            best = None
+
+            for _ in range(repeat):
+                start = time.perf_counter()
+                parallel_evaluate(tree, {'x': x}, out, chunk_size, workers)
+                elapsed = time.perf_counter() - start
+
+                if best is None or elapsed < best:
+                    best = elapsed
+
+            speedup = results[0][1] / best if results != [] else 1.0
+            results.append((workers, best, speedup, speedup / workers))
+            print("%7d %9.3f %9.2f %12.2f" % results[-1])
+
+    return results
+
+if __name__ == '__main__':
+    benchmark(size = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7)
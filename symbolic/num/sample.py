@@ -0,0 +1,153 @@
+"""
+Package: symbolic.num
+Provides modules for fast numeric evaluation of parse trees over many points
+
+Module: sample.py
+Provides adaptive tabulation of expressions for plotting and lookup tables
+
+Functions:
+adaptive_sample - samples a function of one variable densely only where it curves
+"""
+
+import sys
+import numpy as np
+from symbolic.parser import *
+from symbolic.diff.calc import diff
+from symbolic.num.vector import *
+
+def _tabulate(fn, x):
+    """
+    Evaluates a compiled function at the points x, broadcasting constant results
+    """
+
+    return np.array(np.broadcast_to(fn(x), x.shape), dtype = float)
+
+def adaptive_sample(tree, var = 'x', a = 0.0, b = 1.0, tol = 1e-3, initial = 16, min_width = None, max_evals = 100000, curvature = 'numeric'):
+    """
+    Function: symbolic.num.sample.adaptive_sample
+    Samples a function of one variable densely only where it curves
+
+    [a, b] is split into initial intervals, each sampled at its ends and midpoint. An interval whose
+    estimated error of linear interpolation exceeds tol (times |f| where |f| > 1) is halved, and the midpoints of all halves
+    are evaluated together in one batch with a compiled evaluator, until every interval is within
+    tol. The error is estimated either from the deviation of the midpoint from the chord
+    (curvature = 'numeric'), or as |f''| h^2 / 8 with the second derivative from diff
+    (curvature = 'diff').
+
+    Intervals that still exceed tol at min_width, such as those around poles of tan, or when
+    max_evals is reached, and points where the function is not finite, such as log of
+    non-positive values, are marked singular.
+    Intervals with both finite and non-finite values are refined down to min_width to locate the
+    edge of the domain.
+
+    Parameters:
+    tree(parse tree) - function to sample
+    var(string) - name of variable ('x' by default)
+    a(float) - start of the range (0.0 by default)
+    b(float) - end of the range, which may lie before a (1.0 by default)
+    tol(float) - largest allowed interpolation error, relative to the function where it exceeds 1 in magnitude (10^-3 by default)
+    initial(int) - number of intervals to start with, fine enough that no feature fits between samples (16 by default)
+    min_width(float) - width below which intervals are not split (|b - a| * 10^-9 by default)
+    max_evals(int) - number of function evaluations after which refinement stops (100000 by default)
+    curvature(string) - 'numeric' or 'diff', the error estimate to use ('numeric' by default)
+
+    Return:
+    Tuple (xs, ys, singular) of NumPy arrays sorted by xs, where singular marks the points at
+    non-finite values or around unresolved singularities, or None if the function cannot be compiled
+    """
+
+    fn = compile_tree(tree, [var])
+
+    if fn is None:
+        return None
+
+    if curvature == 'diff':
+        d2 = compile_tree(diff(diff(tree, var), var), [var])
+
+        if d2 is None:
+            return None
+
+    elif curvature != 'numeric':
+        print("Unknown curvature estimate", file = sys.stderr)
+        return None
+
+    if a == b:
+        xs = np.array([float(a)])
+        ys = _tabulate(fn, xs)
+        return xs, ys, ~np.isfinite(ys)
+
+    if a > b: # the samples are returned sorted, so a reversed range is the same range
+        a, b = b, a
+
+    if min_width is None:
+        min_width = abs(b - a) * 1e-9
+
+    xs = np.linspace(a, b, 2 * initial + 1)
+    ys = _tabulate(fn, xs)
+    evals = len(xs)
+
+    xs_all = [xs] # every evaluated point is kept as a sample
+    ys_all = [ys]
+    stuck = [] # ends of intervals that could not be resolved
+    exhausted = False # True once max_evals is reached
+
+    # open intervals as arrays of left ends, midpoints and right ends, with the values there
+    l, m, r = xs[0:-1:2], xs[1::2], xs[2::2]
+    fl, fm, fr = ys[0:-1:2], ys[1::2], ys[2::2]
+
+    while len(l) > 0:
+        finite = np.isfinite(fl) & np.isfinite(fm) & np.isfinite(fr)
+        partly = np.isfinite(fl) | np.isfinite(fm) | np.isfinite(fr)
+
+        with np.errstate(all = 'ignore'):
+            if curvature == 'diff':
+                err = np.abs(_tabulate(d2, m)) * (r - l) ** 2 / 32
+            else:
+                err = np.abs(fm - (fl + fr) / 2) / 4
+
+            # the error is relative where the function is large, so steep flanks of poles are not resolved to min_width
+            err /= np.maximum(1.0, np.maximum(np.abs(fm), np.maximum(np.abs(fl), np.abs(fr))))
+
+        err = np.where(finite & ~np.isnan(err), err, np.where(partly, np.inf, 0.0))
+        split = err > tol
+        narrow = split & ((r - l) / 2 < min_width)
+
+        stuck += [l[narrow], m[narrow], r[narrow]]
+        split &= ~narrow
+
+        budget = (max_evals - evals) // 2
+
+        if exhausted:
+            stuck += [l[split], m[split], r[split]]
+            split[:] = False
+        elif np.count_nonzero(split) > budget: # refine only the worst intervals, for the last time
+            print("Evaluation limit reached", file = sys.stderr)
+            worst = np.argsort(np.where(split, -err, np.inf))[:max(budget, 0)]
+            skipped = split.copy()
+            skipped[worst] = False
+            stuck += [l[skipped], m[skipped], r[skipped]]
+            split[:] = False
+            split[worst] = True
+            exhausted = True
+
+        l, m, r = l[split], m[split], r[split]
+        fl, fm, fr = fl[split], fm[split], fr[split]
+
+        # evaluate the midpoints of both halves of every split interval in one batch
+        q = np.concatenate(((l + m) / 2, (m + r) / 2))
+        fq = _tabulate(fn, q)
+        evals += len(q)
+        xs_all.append(q)
+        ys_all.append(fq)
+
+        l, m, r = np.concatenate((l, m)), q, np.concatenate((m, r))
+        fl, fm, fr = np.concatenate((fl, fm)), fq, np.concatenate((fm, fr))
+
+    xs = np.concatenate(xs_all)
+    ys = np.concatenate(ys_all)
+    order = np.argsort(xs, kind = 'stable')
+    xs = xs[order]
+    ys = ys[order]
+    singular = ~np.isfinite(ys) | np.isin(xs, np.concatenate(stuck) if stuck != [] else [])
+
+    return xs, ys, singular
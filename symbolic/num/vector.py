@@ -0,0 +1,151 @@
+"""
+Package: symbolic.num
+Provides modules for fast numeric evaluation of parse trees over many points
+
+Module: vector.py
+Provides compilation of parse trees into functions operating on whole NumPy arrays
+
+Functions:
+variables    - lists the variables appearing in an expression
+compile_tree - compiles a parse tree into a vectorized function
+"""
+
+import sys
+import numpy as np
+from symbolic.parser import *
+
+def variables(tree):
+    """
+    Function: symbolic.num.vector.variables
+    Lists the variables appearing in an expression
+
+    Parameters:
+    tree(parse tree) - given expression
+
+    Return:
+    Sorted list of variable names
+    """
+
+    names = set()
+    pending = [tree]
+
+    while pending != []:
+        node = pending.pop()
+
+        if node[0] == 'var':
+            names.add(node[1])
+        elif node[0] != 'val':
+            pending += node[1:]
+
+    return sorted(names)
+
+def compile_tree(tree, var_names = None):
+    """
+    Function: symbolic.num.vector.compile_tree
+    Compiles a parse tree into a vectorized function
+
+    The tree is translated once into straight-line NumPy code, one statement per node, with
+    subtrees shared between several parents computed only once and intermediate arrays freed
+    as soon as they are no longer needed. Unlike symbolic.parser.evaluate, function values
+    are not rounded, and invalid operations give nan or inf instead of raising.
+
+    Parameters:
+    tree(parse tree) - expression to compile
+    var_names(list of strings) - order of the arguments of the compiled function (variables(tree) by default)
+
+    Return:
+    A function taking one NumPy array (or float) per variable and returning the broadcast result,
+    or None if the expression cannot be compiled
+    """
+
+    fcode = {'sin': 'np.sin(%s)', 'cos': 'np.cos(%s)', 'tan': 'np.tan(%s)', 'cot': 'np.divide(1.0, np.tan(%s))', 'sec': 'np.divide(1.0, np.cos(%s))', 'csc': 'np.divide(1.0, np.sin(%s))', 'log': 'np.log(%s)', 'exp': 'np.exp(%s)', '-': 'np.negative(%s)', '+': 'np.positive(%s)'}
+    ocode = {'+': 'np.add', '-': 'np.subtract', '*': 'np.multiply', '/': 'np.divide', '^': 'np.power'}
+
+    if var_names is None:
+        var_names = variables(tree)
+
+    args = {v: 'a' + str(i) for i, v in enumerate(var_names)} # argument name of each variable
+
+    # count parents of every node; nodes are identified by id so shared subtrees are not rehashed
+    uses = {}
+    pending = [tree]
+
+    while pending != []:
+        node = pending.pop()
+
+        if node[0] in ['val', 'var']:
+            continue
+
+        for child in node[1:]:
+            uses[id(child)] = uses.get(id(child), 0) + 1
+
+            if uses[id(child)] == 1:
+                pending.append(child)
+
+    names = {} # local name or literal holding the value of each computed node
+    lines = [] # body of the compiled function
+    pending = [tree]
+
+    while pending != []:
+        node = pending[-1]
+
+        if id(node) in names:
+            pending.pop()
+            continue
+
+        op = node[0]
+
+        if op == 'val':
+            names[id(node)] = repr(float(spcs.get(node[1], node[1])))
+            pending.pop()
+            continue
+
+        elif op == 'var':
+            if node[1] not in args:
+                print("Unknown variable", file = sys.stderr)
+                return None
+
+            names[id(node)] = args[node[1]]
+            pending.pop()
+            continue
+
+        missing = [child for child in node[1:] if id(child) not in names]
+
+        if missing != []: # compute arguments first
+            pending += missing
+            continue
+
+        if op[0] == 'fn':
+            if op[1] not in fcode:
+                print("Unsupported function", file = sys.stderr)
+                return None
+
+            code = fcode[op[1]] % names[id(node[1])]
+
+        elif op[0] == 'op':
+            code = ocode[op[1]] + '(' + names[id(node[1])] + ', ' + names[id(node[2])] + ')'
+
+        else:
+            print("Bad expression", file = sys.stderr)
+            return None
+
+        pending.pop()
+        names[id(node)] = 't' + str(len(names))
+        lines.append(names[id(node)] + ' = ' + code)
+
+        for child in node[1:]: # free temporaries after their last use
+            uses[id(child)] -= 1
+
+            if uses[id(child)] == 0 and names[id(child)][0] == 't':
+                lines.append('del ' + names[id(child)])
+
+    lines.append('return ' + names[id(tree)])
+
+    src = 'def compiled(' + ', '.join(args.values()) + '):\n'
+    src += "    with np.errstate(all = 'ignore'):\n"
+    src += ''.join('        ' + line + '\n' for line in lines)
+
+    scope = {'np': np, 'inf': np.inf, 'nan': np.nan}
+    exec(src, scope)
+
+    return scope['compiled']
@@ -5,6 +5,7 @@ Package for using symbolic expressions
 Sub-packages:
 ritam - provides a module for symbolic manipulation 
 nag   - provides a module for symbolic treatment of calculus
+num   - provides modules for fast numeric evaluation over arrays
 
 Module: parser.py
 Module for parsing and numeric evaluation of symbolic expressions
@@ -123,6 +124,7 @@ def parse(token_list):
     parse_tree := <var/val token> | (<op/fn token>, parse_tree1, [optionalparse_tree2])
 
     Each parse tree represents a hierarchy of functions/operations performed on values or variables, and return value is equivalent to token_list
+    Unary minus applied to a number is folded into a negative value, so -2 gives ('val', -2.0)
     """
 
     # This function implements the Shunting-Yard algorithm
@@ -162,7 +164,11 @@ def parse(token_list):
                         return None
 
                     e1 = trees.pop()
-                    trees.append((op, e1))
+
+                    if op == ('fn', '-') and e1[0] == 'val' and not isinstance(e1[1], str): # negated numbers are negative values
+                        trees.append(('val', -e1[1]))
+                    else:
+                        trees.append((op, e1))
                         
                 else:
                     if len(trees) == 0: # insufficient argmuents
@@ -204,7 +210,11 @@ def parse(token_list):
                                 return None
 
                             e1 = trees.pop()
-                            trees.append((op, e1))
+
+                            if op == ('fn', '-') and e1[0] == 'val' and not isinstance(e1[1], str): # negated numbers are negative values
+                                trees.append(('val', -e1[1]))
+                            else:
+                                trees.append((op, e1))
                                 
                         else:
                             if len(trees) == 0: # insufficient argmuents
@@ -6,13 +6,21 @@ Module: manip.py
 Provides functions for substitution, simplification, and reduction of parse trees to infix expressions
 
 Functions:
-substitue - substitutes an expression in place of a variable
-simplify  - simplifies the given expression
-infixify  - creates an infix expression out of a parse tree
+substitue   - substitutes an expression in place of a variable
+fold        - evaluates an operation or function on values
+simplify    - simplifies the given expression
+write_infix - writes the infix expression of a parse tree to a text stream
+infixify    - creates an infix expression out of a parse tree
+
+Constants:
+simplify_rules - table of rewrite rules used by simplify
 """
 
 import sys
+from io import StringIO
+from decimal import Decimal
 from symbolic.parser import *
+from symbolic.symb.rules import RuleTable
 
 def substitute(main_expr, sub_expr, var = 'x'):
     """
@@ -47,176 +55,205 @@ def substitute(main_expr, sub_expr, var = 'x'):
         return None
 
 
-def simplify(expr):
+def fold(expr, bindings = None):
+    """
+    Function: symbolic.symb.manip.fold
+    Evaluates an operation or function whose arguments are all values
+
+    Parameters:
+    expr(parse tree) - given operation or function on values
+    bindings(dict) - unused; present so that fold can serve as a rule replacement
+
+    Return:
+    A value token, or None if the evaluation fails or gives a non-real result
+    """
+
+    try:
+        value = evaluate(expr)
+    except (ArithmeticError, ValueError):
+        return None
+
+    if isinstance(value, complex):
+        return None
+
+    return ('val', value)
+
+# Rules used by simplify, as (pattern, replacement) pairs tried in order; see symbolic.symb.rules
+# Pattern variables starting with k only match values
+
+simplify_rules = RuleTable(
+    [('+a', 'a')] +
+    [(f + '(k)', fold) for f in fns + ['-']] +
+    [('-(-a)', 'a'),
+     ('-(a + b)', '(-a) + (-b)'),
+     ('-(a - b)', 'b - a'),
+     ('-(k * a)', '(-k) * a'),
+     ('exp(log(a))', 'a'),
+     ('log(exp(a))', 'a'),
+     ('exp(b * log(a))', 'a ^ b'),
+     ('exp(-log(a))', 'a ^ -1')] +
+
+    [('k1 ' + o + ' k2', fold) for o in ops] + # evaluate operations on values first
+
+    [('a + k', 'k + a'), # values go first
+     ('0 + a', 'a'),
+     ('a + (b + c)', '(a + b) + c'), # group to the left
+     ('a + (b - c)', '(a + b) - c'),
+     ('a + -b', 'a - b'),
+     ('(a - b) + b', 'a'),
+
+     ('a - 0', 'a'),
+     ('a - a', '0'),
+     ('a - -b', 'a + b'),
+     ('a - (b - c)', '(a + c) - b'),
+     ('k1 - (k2 + a)', '(k1 - k2) - a'),
+     ('(a + b) - b', 'a'),
+
+     ('a * k', 'k * a'),
+     ('0 * a', '0'),
+     ('1 * a', 'a'),
+     ('-1 * a', '-a'),
+     ('(-a) * b', '-(a * b)'),
+     ('a * -b', '-(a * b)'),
+     ('a * (b * c)', '(a * b) * c'),
+     ('a * (b / c)', '(a * b) / c'),
+     ('(a / b) * b', 'a'),
+     ('a ^ b * a ^ c', 'a ^ (b + c)'),
+     ('a ^ b * a', 'a ^ (b + 1)'),
+     ('a * a ^ b', 'a ^ (b + 1)'),
+     ('(a * b ^ c) * b ^ d', 'a * b ^ (c + d)'),
+     ('(a ^ b * c) * a ^ d', 'a ^ (b + d) * c'),
+
+     ('a / 1', 'a'),
+     ('0 / a', '0'),
+     ('a / a', '1'),
+     ('a / -1', '-a'),
+     ('(-a) / b', '-(a / b)'),
+     ('a / -b', '-(a / b)'),
+     ('a / (b / c)', '(a * c) / b'),
+     ('k1 / (k2 * a)', '(k1 / k2) / a'),
+     ('(a * b) / b', 'a'),
+     ('a ^ b / a', 'a ^ (b - 1)'),
+     ('a / b ^ c', 'a * b ^ -c'),
+     ('a / b', 'a * b ^ -1'), # divisions become negative powers
+
+     ('a ^ 0', '1'),
+     ('0 ^ a', '0'),
+     ('1 ^ a', '1'),
+     ('a ^ 1', 'a'),
+     ('(a ^ b) ^ c', 'a ^ (b * c)')])
+
+def simplify(expr, max_rewrites = 100000):
     """
     Function: symbolic.symb.manip.simplify
-    Simplifies the given expression 
+    Simplifies the given expression by rewriting it with simplify_rules until no rule applies
+
+    Further rules can be registered with simplify_rules.add(pattern, replacement)
 
     Parameters:
     expr(parse tree) - given expression
+    max_rewrites(int) - number of rewrites after which simplification stops (100000 by default)
     
     Return:
     A parse tree representing the expression after simplification
     """
 
-    op = expr[0]
-
-    if op in ['val', 'var']: # a values and variables are already fully simplified 
-        return expr
-
-    elif op[0] == 'fn': # recursively simplify argument
-        sim1 = simplify(expr[1])
-
-        if op[1] == '+': # unary + is redundant
-            return sim1 
-        elif sim1[0] == 'val': # evaluate all functions that can be evaluated
-            return ('val', evaluate((op, sim1)))
-        elif op[1] == '-' and sim1[0] == ('fn', '-'):
-            return sim1[1]
-        elif op[1] == '-' and sim1[0] == ('op', '+'):
-            return simplify((('op', '+'), (('fn', '-'), sim1[1]), (('fn', '-'), sim1[2]))) 
-        elif op[1] == '-' and sim1[0] == ('op', '-'):
-            return simplify((('op', '-'), sim1[2], sim1[1]))
-        elif op[1] == '-' and sim1[0] == ('op', '*') and sim1[1][0] == 'val':
-            return simplify((('op', '*'), (('fn', '-'), sim1[1]), sim1[2]))
-        elif op[1] == 'exp' and sim1[0] == ('fn', 'log'):
-            return sim1[1]
-        elif op[1] == 'log' and sim1[0] == ('fn', 'exp'):
-            return sim1[1]
-        elif op[1] == 'exp' and sim1[0] == ('op', '*') and sim1[2][0] == ('fn', 'log'):
-            return (('op', '^'), sim1[2][1], sim1[1])
-        elif op[1] == 'exp' and sim1[0] == ('fn', '-') and sim1[1][0] == ('fn', 'log'):
-            return (('op', '^'), sim1[1][1], ('val', -1.0))
-        else:
-            return (op, sim1)
-
-    elif op[0] == 'op': # recursively simplify both arguments
-        sim1 = simplify(expr[1])
-        sim2 = simplify(expr[2])
-
-        if sim1[0] == 'val' and sim2[0] == 'val': # if both are values, perform evaluation
-            return ('val', evaluate((op, sim1, sim2)))
-
-        elif op[1] == '+':
-            if sim2[0] == 'val':
-                return simplify((('op', '+'), sim2, sim1))
-            elif sim1 == ('val', 0.0):
-                return sim2
-            elif sim2[0] in [('op', '+'), ('op', '-')]:
-                return simplify((sim2[0], (op, sim1, sim2[1]), sim2[2]))
-            elif sim2[0] == ('fn', '-'):
-                return simplify((('op', '-'), sim1, sim2[1]))
-            elif sim1[0] == ('op', '-') and sim1[2] == sim2:
-                return sim1[1]
+    return simplify_rules.rewrite(expr, max_rewrites)
     
-        elif op[1] == '-':
-            if sim2 == ('val', 0.0):
-                return sim1
-            elif sim1 == sim2:
-                return ('val', 0.0)
-            elif sim2[0] == ('fn', '-'):
-                return simplify((('op', '+'), sim1, sim2[1]))
-            elif sim2[0] == ('op', '-'):
-                return simplify((op, (('op', '+'), sim1, sim2[2]), sim2[1]))
-            elif sim1[0] == 'val' and sim2[0] == ('op', '+') and sim2[1][0] == 'val':
-                return simplify((op, (op, sim1, sim2[1]), sim2[2]))
-            elif sim1[0] == ('op', '+') and sim1[2] == sim2:
-                return sim1[1]
-            
-        elif op[1] == '*':
-            if sim2[0] == 'val':
-                return simplify((op, sim2, sim1))
-            elif sim1 == ('val', 0.0):
-                return sim1
-            elif sim1 == ('val', 1.0):
-                return sim2
-            elif sim1 == ('val', -1.0):
-                return simplify((('fn', '-'), sim2))
-            elif sim1[0] == ('fn', '-'):
-                return simplify((('fn', '-'), (op, sim1[1], sim2)))
-            elif sim2[0] == ('fn', '-'):
-                return simplify((('fn', '-'), (op, sim1, sim2[1])))
-            elif sim2[0] in [('op', '*'), ('op', '/')]:
-                return simplify((sim2[0], (op, sim1, sim2[1]), sim2[2]))
-            elif sim1[0] == ('op', '/') and sim1[2] == sim2:
-                return sim1[1]
-            elif sim1[0] == ('op', '^') and sim2[0] == ('op', '^') and sim1[1] == sim2[1]:
-                return simplify((('op', '^'), sim1[1], (('op', '+'), sim1[2], sim2[2])))
-            elif sim1[0] == ('op', '^') and sim1[1] == sim2:
-                return simplify((('op', '^'), sim1[1], (('op', '+'), sim1[2], ('val', 1.0))))
-            elif sim2[0] == ('op', '^') and sim2[1] == sim1:
-                return simplify((('op', '^'), sim1, (('op', '+'), sim2[2], ('val', 1.0))))
-            elif sim1[0] == ('op', '^') and sim2[1] == sim1:
-                return simplify((('op', '^'), sim1, (('op', '+'), sim2[2], ('val', 1.0))))
-            elif sim1[0] == ('op', '*') and sim1[2][0] == ('op', '^') and sim2[0] == ('op', '^') and sim2[1] == sim1[2][1]:
-                return simplify((op, sim1[1], (('op', '^'), sim2[1], (('op', '+'), sim1[2][2], sim2[2]))))
-            elif sim1[0] == ('op', '*') and sim1[1][0] == ('op', '^') and sim2[0] == ('op', '^') and sim2[1] == sim1[1][1]:
-                return simplify((op, (('op', '^'), sim2[1], (('op', '+'), sim1[1][2], sim2[2])), sim1[2]))
-             
-        elif op[1] == '/':
-            if sim2 == ('val', 1.0):
-                return sim1
-            elif sim1 == ('val', 0.0):
-                return sim1
-            elif sim1 == sim2:
-                return ('val', 1.0)
-            elif sim2 == ('val', -1.0):
-                return simplify((('fn', '-'), sim2))
-            elif sim1[0] == ('fn', '-'):
-                return simplify((('fn', '-'), (op. sim1[1], sim2)))
-            elif sim2[0] == ('fn', '-'):
-                return simplify((('fn', '-'), (op. sim1, sim2[1])))
-            elif sim2[0] == ('op', '/'):
-                return simplify((op, (('op', '*'), sim1, sim2[2]), sim2[1]))
-            elif sim1[0] == 'val' and sim2[0] == ('op', '*') and sim2[1][0] == 'val':
-                return simplify((op, (op, sim1, sim2[1]), sim2[2])) 
-            elif sim1[0] == ('op', '*') and sim1[2] == sim2:
-                return sim1[1]
-            elif sim1[0] == ('op', '^') and sim1[1] == sim2:
-                return simplify((('op', '^'), sim1[1], (('op', '-'), sim1[2], ('val', 1.0))))
-            elif sim2[0] == ('op', '^'):
-                return simplify((('op', '*'), sim1, (('op', '^'), sim2[1], (('fn', '-'), sim2[2]))))
+
+def write_infix(expr, stream, max_len = None):
+    """
+    Function: symbolic.symb.manip.write_infix
+    Writes the infix expression of a parse tree to a text stream in a single pass
+
+    Parentheses are only written where the operator priorities and associativity used by
+    symbolic.parser.parse require them, so parse(tokenize(...)) of the output gives back expr
+    The exceptions are inf and nan values, which have no infix form; they are written as inf and nan,
+    which parse back as variables
+
+    Parameters:
+    expr(parse tree) - given expression
+    stream(text stream) - any object with a write method, such as a file, sys.stdout or io.StringIO
+    max_len(int) - number of characters after which the rest of the expression is elided as '...' (None by default, for no limit)
+
+    Return:
+    The number of characters written, or None if the expression is bad (in which case the output is incomplete)
+    """
+
+    pr = {'+': 1, '-': 1, '*': 2, '/': 2, '^': 3} # operator priority, as in symbolic.parser.parse
+
+    written = 0 # number of characters written so far
+    pending = [expr] # stack of subtrees and strings still to be written, next one on top
+
+    while pending != []:
+        item = pending.pop()
+
+        if isinstance(item, str):
+            piece = item
+
+        elif item[0] in ['var', 'val']:
+            piece = str(item[1])
+
+            if isinstance(item[1], float) and 'e' in piece: # the tokenizer cannot read exponent notation
+                piece = format(Decimal(piece), 'f')
+
+        elif item[0][0] == 'fn':
+            op = item[0]
+            arg = item[1]
+
+            if op[1] in ['+', '-'] and arg[0][0] != 'op': # unary operators only need parentheses around binary operations
+                pending += [arg, op[1]]
             else:
-                return simplify((('op', '*'), sim1, (('op', '^'), sim2, ('val', -1.0))))
-        
-        elif op[1] == '^':
-            if sim2 == ('val', 0.0):
-                return ('val', 1.0)
-            elif sim1 in [('val', 0.0), ('val', 1.0)] or sim2 == ('val', 1.0):
-                return sim1
-            elif sim1[0] == ('op', '^'):
-                return simplify(((op, sim1[1], (('op', '*'), sim1[2], sim2)))) 
-        
-        return (op, sim1, sim2)
-    
-    else:
-        print("Bad expression", file = sys.stderr)
-        return None
-    
+                pending += [')', arg, op[1] + '(']
+
+            continue
 
-def infixify(expr):
+        elif item[0][0] == 'op':
+            op = item[0]
+            lhs = item[1]
+            rhs = item[2]
+
+            # same priority operations are grouped left to right, except for right-associative ^
+            rpar = rhs[0][0] == 'op' and (pr[rhs[0][1]] < pr[op[1]] or (pr[rhs[0][1]] == pr[op[1]] and op[1] != '^'))
+            lpar = lhs[0][0] == 'op' and (pr[lhs[0][1]] < pr[op[1]] or (pr[lhs[0][1]] == pr[op[1]] and op[1] == '^'))
+            # the parser reads -x ^ 2 as (-x) ^ 2, but people read it as -(x ^ 2), so negations get parentheses for readability
+            lpar = lpar or (op[1] == '^' and ((lhs[0][0] == 'fn' and lhs[0][1] in ['+', '-']) or (lhs[0] == 'val' and not isinstance(lhs[1], str) and lhs[1] < 0)))
+
+            pending += [')', rhs, '('] if rpar else [rhs]
+            pending.append(' ' + op[1] + ' ')
+            pending += [')', lhs, '('] if lpar else [lhs]
+
+            continue
+
+        else:
+            print("Bad expression", file = sys.stderr)
+            return None
+
+        if max_len is not None and written + len(piece) > max_len: # elide everything past max_len
+            stream.write(piece[:max_len - written] + '...')
+            return max_len + 3
+
+        stream.write(piece)
+        written += len(piece)
+
+    return written
+
+def infixify(expr, max_len = None):
     """
     Function: symbolic.symb.manip.infixify
     Creates an infix expression out of a parse tree
 
     Parameters:
     expr(parse tree) - given expression
+    max_len(int) - number of characters after which the rest of the expression is elided as '...' (None by default, for no limit)
     
     Return:
-    A string with the infix expression
+    A string with the infix expression, using as few parentheses as possible
     """
 
-    op = expr[0]
-
-    if op in ['var', 'val']: 
-        return str(expr[1])
-
-    elif op[0] == 'fn': # recursively get infix expression of argument
-        return op[1] + '(' + infixify(expr[1]) + ')'
-
-    elif op[0] == 'op': # recursively get infix of both arguments
-        return '(' + infixify(expr[1]) + ' ' + op[1] + ' '  + infixify(expr[2]) + ')'
+    buf = StringIO()
 
-    else:
-        print("Bad expression", file = sys.stderr)
+    if write_infix(expr, buf, max_len) is None:
         return None
+
+    return buf.getvalue()
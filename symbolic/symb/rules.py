@@ -0,0 +1,261 @@
+"""
+Package: symbolic.symb
+Provides a module for symbolic manipulation
+
+Module: rules.py
+Provides a rule-based rewrite engine for parse trees
+
+Rules are pairs (pattern, replacement). A pattern is an infix string (or a parse tree) whose
+variables are pattern variables: the same name must match equal subtrees, and names starting
+with 'k' only match values. A replacement is an infix string over the pattern variables, or a
+function replacement(node, bindings) returning a parse tree, or None if the rule does not apply.
+Negated numbers in rules, such as -1, stand for negative values.
+
+Classes:
+RuleTable - table of rewrite rules indexed by head operator and child kinds
+"""
+
+import sys
+from symbolic.parser import *
+
+def _compile(rule_expr):
+    """
+    Parses a pattern or replacement string, folding negated numbers into negative values
+    """
+
+    if isinstance(rule_expr, str):
+        rule_expr = parse(tokenize(rule_expr))
+
+    if rule_expr[0] in ['val', 'var']:
+        return rule_expr
+
+    args = tuple(_compile(arg) for arg in rule_expr[1:])
+
+    if rule_expr[0] == ('fn', '-') and args[0][0] == 'val' and not isinstance(args[0][1], str):
+        return ('val', -args[0][1])
+
+    return (rule_expr[0],) + args
+
+def _names(rule_expr):
+    """
+    Returns the set of pattern variable names in a compiled pattern or replacement
+    """
+
+    if rule_expr[0] == 'var':
+        return {rule_expr[1]}
+    elif rule_expr[0] == 'val':
+        return set()
+
+    return set().union(*[_names(arg) for arg in rule_expr[1:]])
+
+def _kind(tree):
+    """
+    Returns the kind of a node used for indexing: 'val', 'var' or its head operator
+    """
+
+    return tree[0]
+
+def _pattern_kind(pattern):
+    """
+    Returns the kind of node a pattern matches, or None if it matches any node
+    """
+
+    if pattern[0] == 'var':
+        return 'val' if pattern[1][0] == 'k' else None
+
+    return _kind(pattern)
+
+def _match(pattern, tree, bindings):
+    """
+    Matches tree against pattern, adding the pattern variables to bindings
+
+    Return:
+    True if tree matches
+    """
+
+    if pattern[0] == 'var':
+        if pattern[1][0] == 'k' and tree[0] != 'val':
+            return False
+        elif pattern[1] in bindings:
+            return bindings[pattern[1]] == tree
+
+        bindings[pattern[1]] = tree
+        return True
+
+    elif pattern[0] == 'val':
+        return tree == pattern
+
+    return tree[0] == pattern[0] and len(tree) == len(pattern) and all(_match(p, t, bindings) for p, t in zip(pattern[1:], tree[1:]))
+
+def _instantiate(template, bindings):
+    """
+    Builds a parse tree from a replacement template, substituting the pattern variables
+    """
+
+    if template[0] == 'var':
+        return bindings[template[1]]
+    elif template[0] == 'val':
+        return template
+
+    return (template[0],) + tuple(_instantiate(arg, bindings) for arg in template[1:])
+
+class RuleTable:
+    """
+    Class: symbolic.symb.rules.RuleTable
+    Table of rewrite rules indexed by head operator and child kinds
+
+    Only rules whose pattern has the head operator of a node, and whose children can match the
+    kinds of its children, are tried on it. Rules for the same node are tried in the order they
+    were added.
+
+    Attributes:
+    rules(dict) - maps each head operator to its list of (pattern, replacement, child kinds) rules
+    """
+
+    def __init__(self, rules = []):
+        """
+        Creates a table holding the given rules
+
+        Parameters:
+        rules(list of 2-tuples) - (pattern, replacement) pairs, in order of priority (empty by default)
+        """
+
+        self.rules = {}
+        self._index = {} # cache of the candidate rules for each (head, child kinds) key
+
+        for pattern, replacement in rules:
+            self.add(pattern, replacement)
+
+    def add(self, pattern, replacement, first = False):
+        """
+        Adds a rule to the table
+
+        Parameters:
+        pattern(string or parse tree) - pattern matched against a node
+        replacement(string, parse tree or function) - what the matched node is rewritten to
+        first(bool) - if True, the rule is tried before the existing rules for its head (False by default)
+
+        Return:
+        True if the rule was added
+        """
+
+        pattern = _compile(pattern)
+
+        if pattern[0] in ['val', 'var']:
+            print("Rule pattern must have an operator or function at its head", file = sys.stderr)
+            return False
+
+        if not callable(replacement):
+            replacement = _compile(replacement)
+
+            if not _names(replacement) <= _names(pattern):
+                print("Unbound variable in rule replacement", file = sys.stderr)
+                return False
+
+        head = _kind(pattern)
+        rule = (pattern, replacement, tuple(_pattern_kind(arg) for arg in pattern[1:]))
+        rules = self.rules.setdefault(head, [])
+
+        if first:
+            rules.insert(0, rule)
+        else:
+            rules.append(rule)
+
+        self._index = {}
+        return True
+
+    def candidates(self, tree):
+        """
+        Returns the rules that may apply to the root of tree, in order of priority
+        """
+
+        key = (_kind(tree),) + tuple(_kind(arg) for arg in tree[1:])
+
+        if key not in self._index:
+            self._index[key] = [rule for rule in self.rules.get(key[0], []) if len(rule[2]) == len(key) - 1 and all(k is None or k == c for k, c in zip(rule[2], key[1:]))]
+
+        return self._index[key]
+
+    def rewrite(self, expr, max_rewrites = 100000):
+        """
+        Rewrites an expression bottom-up until no rule applies
+
+        Children are brought to normal form before their parent. After a rewrite only the newly
+        built part of the tree is normalized again, since subtrees taken over from the match
+        already are.
+
+        Parameters:
+        expr(parse tree) - given expression
+        max_rewrites(int) - number of rewrites after which rewriting stops, guarding against cyclic rules (100000 by default)
+
+        Return:
+        The rewritten parse tree, or None for a bad expression
+        """
+
+        normal = {} # nodes known to be in normal form by id; holding them keeps the ids unique
+        count = [0] # number of rewrites performed
+
+        def normalize(tree):
+            # each rewrite loops back to the current node instead of recursing, so the depth of
+            # recursion is bounded by the depth of the tree and max_rewrites can stop cyclic rules
+            while True:
+                head = tree[0]
+
+                if head == 'val' or head == 'var' or id(tree) in normal:
+                    return tree
+
+                if head[0] not in ['fn', 'op']:
+                    raise ValueError(tree)
+
+                # the rules are looked up on the normalized children; the root head and child kinds need no further matching
+                if len(tree) == 3:
+                    lhs = normalize(tree[1])
+                    rhs = normalize(tree[2])
+
+                    if lhs is not tree[1] or rhs is not tree[2]:
+                        tree = (head, lhs, rhs)
+
+                    key = (head, lhs[0], rhs[0])
+                else:
+                    arg = normalize(tree[1])
+
+                    if arg is not tree[1]:
+                        tree = (head, arg)
+
+                    key = (head, arg[0])
+
+                rules = self._index.get(key)
+
+                if rules is None:
+                    rules = self.candidates(tree)
+
+                result = None
+
+                if count[0] < max_rewrites:
+                    for pattern, replacement, kinds in rules:
+                        bindings = {}
+
+                        if not all(_match(p, t, bindings) for p, t in zip(pattern[1:], tree[1:])):
+                            continue
+
+                        result = replacement(tree, bindings) if callable(replacement) else _instantiate(replacement, bindings)
+
+                        if result is not None:
+                            break
+
+                if result is None: # no rule applies
+                    normal[id(tree)] = tree
+                    return tree
+
+                count[0] += 1
+
+                if count[0] == max_rewrites:
+                    print("Rewrite limit reached", file = sys.stderr)
+
+                tree = result
+
+        try:
+            return normalize(expr)
+        except ValueError:
+            print("Bad expression", file = sys.stderr)
+            return None
@@ -0,0 +1,47 @@
+import random
+from symbolic.parser import *
+from symbolic.symb.manip import *
+from symbolic.diff.calc import diff
+
+def random_tree(rng, depth):
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice([('var', 'x'), ('var', 'y'), ('val', 2.0), ('val', -1.0), ('val', -0.5), ('val', 'pi'), ('val', 1e-7), ('val', -3e20)])
+    elif rng.random() < 0.3:
+        fn = rng.choice(['sin', 'log', 'exp', '-', '+'])
+        arg = random_tree(rng, depth - 1)
+
+        if fn == '-' and arg[0] == 'val' and not isinstance(arg[1], str): # parse gives a negative value here
+            return ('val', -arg[1])
+
+        return (('fn', fn), arg)
+
+    return (('op', rng.choice(ops)), random_tree(rng, depth - 1), random_tree(rng, depth - 1))
+
+def round_trip(tree):
+    return parse(tokenize(infixify(tree)))
+
+def test_round_trip_random_trees():
+    rng = random.Random(0)
+
+    for _ in range(5000):
+        tree = random_tree(rng, rng.randint(0, 6))
+        assert round_trip(tree) == tree, infixify(tree)
+
+def test_round_trip_negative_values():
+    for tree in [(('op', '^'), ('var', 'x'), ('val', -1.0)),
+                 (('op', '-'), ('var', 'x'), ('val', -1.0)),
+                 (('op', '^'), ('val', -2.0), ('var', 'x')),
+                 (('op', '*'), ('var', 'x'), (('op', '^'), ('val', -2.0), ('var', 'x')))]:
+        assert round_trip(tree) == tree
+
+def test_round_trip_derivatives():
+    for expr in ['sin(x)/x', 'x^-2', '1/(x^2+1)', 'log(x)^3', 'exp(-x)*cos(2*x)']:
+        tree = diff(parse(tokenize(expr)))
+        assert round_trip(tree) == tree, expr
+
+def test_minimal_parentheses():
+    assert infixify(parse(tokenize('(a - (b - c)) + (d + e) * f ^ g ^ h'))) == 'a - (b - c) + (d + e) * f ^ g ^ h'
+    assert infixify(parse(tokenize('(-x) ^ 2'))) == '(-x) ^ 2.0'
+
+def test_elision():
+    assert infixify(parse(tokenize('a - (b - c)')), 6) == 'a - (b...'
@@ -0,0 +1,83 @@
+import math
+import pytest
+from symbolic.parser import *
+
+np = pytest.importorskip('numpy')
+
+from multiprocessing.shared_memory import SharedMemory
+from symbolic.num import parallel
+from symbolic.num.vector import compile_tree
+from symbolic.num.parallel import SharedArray, parallel_evaluate
+
+def test_compile_tree_matches_numpy():
+    x = np.linspace(0.1, 3.0, 50)
+    y = np.linspace(-2.0, 2.0, 50)
+
+    fn = compile_tree(parse(tokenize('log(x) * exp(-y) + x ^ 2 / cos(y)')), ['x', 'y'])
+    assert np.allclose(fn(x, y), np.log(x) * np.exp(-y) + x ** 2 / np.cos(y))
+
+    assert compile_tree(parse(tokenize('x - y')), ['y', 'x'])(1.0, 2.0) == 1.0
+    assert compile_tree(parse(tokenize('2 * pi')), [])() == pytest.approx(2 * math.pi)
+
+def test_compile_tree_shared_subtree():
+    s = parse(tokenize('sin(x) + 1'))
+    tree = (('op', '*'), (('op', '+'), s, (('op', '*'), s, s)), s)
+    x = np.linspace(-3.0, 3.0, 50)
+    ref = np.sin(x) + 1
+
+    assert np.allclose(compile_tree(tree)(x), (ref + ref * ref) * ref)
+
+def test_parallel_matches_serial():
+    tree = parse(tokenize('sin(x) ^ 2 + log(1 + y ^ 2)'))
+    rng = np.random.default_rng(0)
+    x = rng.normal(size = (37, 29))
+    y = rng.normal(size = (37, 29))
+
+    with SharedArray.copy_of(x) as xs, SharedArray.copy_of(y) as ys:
+        serial = parallel_evaluate(tree, {'x': xs, 'y': ys}, workers = 1)
+        shared = parallel_evaluate(tree, {'x': xs, 'y': ys}, chunk_size = 100, workers = 2)
+
+        try:
+            assert shared.array.shape == (37, 29)
+            assert np.array_equal(serial.array, shared.array)
+            assert np.allclose(shared.array, np.sin(x) ** 2 + np.log(1 + y ** 2))
+        finally:
+            serial.close()
+            shared.close()
+
+def test_constant_expression():
+    with SharedArray((10,)) as out:
+        assert parallel_evaluate(parse(tokenize('2 + 3')), {}, out, chunk_size = 3, workers = 2) is out
+        assert np.all(out.array == 5.0)
+
+    assert parallel_evaluate(parse(tokenize('2 + 3')), {}) is None
+
+def test_bad_arguments():
+    tree = parse(tokenize('x + y'))
+
+    with SharedArray((10,)) as x, SharedArray((11,)) as y, SharedArray((10,), 'int64') as out:
+        assert parallel_evaluate(tree, {'x': x, 'y': y}) is None
+        assert parallel_evaluate(tree, {'x': x, 'y': x}, chunk_size = 0) is None
+        assert parallel_evaluate(tree, {'x': x}) is None
+        assert parallel_evaluate(tree, {'x': x, 'y': x}, out) is None
+
+def test_output_freed_on_failure(monkeypatch):
+    created = []
+
+    class Recorded(SharedArray):
+        def __init__(self, *args, **kwargs):
+            SharedArray.__init__(self, *args, **kwargs)
+            created.append(self.shm.name)
+
+    monkeypatch.setattr(parallel, 'SharedArray', Recorded)
+
+    with SharedArray.copy_of(np.array(['a', 'b', 'c'])) as x: # sin of strings raises
+        for workers in [1, 2]:
+            with pytest.raises(Exception):
+                parallel_evaluate(parse(tokenize('sin(x)')), {'x': x}, chunk_size = 2, workers = workers)
+
+    assert len(created) == 2
+
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name)
@@ -0,0 +1,50 @@
+import math
+import pytest
+from symbolic.parser import *
+
+np = pytest.importorskip('numpy')
+
+from symbolic.num.sample import adaptive_sample
+
+def sample(expr, a, b, **kwargs):
+    return adaptive_sample(parse(tokenize(expr)), 'x', a, b, **kwargs)
+
+def test_refines_to_tol():
+    xs, ys, singular = sample('1/(1+100*x^2)', -3.0, 3.0, tol = 1e-3)
+    fine = np.linspace(-3.0, 3.0, 600001)
+    ref = 1 / (1 + 100 * fine ** 2)
+    grid = np.linspace(-3.0, 3.0, len(xs))
+
+    assert np.all(np.diff(xs) > 0)
+    assert not singular.any()
+    assert np.max(np.abs(np.interp(fine, xs, ys) - ref)) <= 1e-3
+    assert np.max(np.abs(np.interp(fine, grid, 1 / (1 + 100 * grid ** 2)) - ref)) > 10 * 1e-3
+
+def test_pole_of_tan():
+    xs, ys, singular = sample('tan(x)', 0.0, 3.0)
+
+    assert singular.any()
+    assert np.all(np.abs(xs[singular] - math.pi / 2) < 1e-6)
+
+def test_edge_of_domain():
+    xs, ys, singular = sample('log(x)', -1.0, 1.0)
+
+    assert np.all(singular[xs <= 0])
+    assert not singular[xs > 1e-8].any()
+
+def test_evaluation_limit():
+    xs, ys, singular = sample('sin(100*x)', 0.0, 10.0, max_evals = 500)
+
+    assert len(xs) <= 500
+    assert np.count_nonzero(singular) > len(xs) // 2
+
+def test_degenerate_and_reversed_ranges():
+    xs, ys, singular = sample('x^2', 2.0, 2.0)
+
+    assert list(xs) == [2.0] and list(ys) == [4.0] and not singular.any()
+
+    forward = sample('exp(-(x^2))*sin(20*x)', -3.0, 3.0)
+    backward = sample('exp(-(x^2))*sin(20*x)', 3.0, -3.0)
+
+    assert all(np.array_equal(f, b) for f, b in zip(forward, backward))
+    assert not backward[2].any()
@@ -0,0 +1,38 @@
+import math
+import pytest
+from symbolic.parser import *
+from symbolic.diff.calc import taylor
+from symbolic.diff.series import TaylorSeries
+
+def series(expr, terms = 6, pos = 0.0):
+    return taylor(parse(tokenize(expr)), terms, pos)
+
+def test_horner_evaluation():
+    assert series('sin(x)')(0.3) == pytest.approx(math.sin(0.3), abs = 1e-5)
+    assert series('log(x)', 4, 1.0)(1.1) == pytest.approx(math.log(1.1), abs = 1e-4)
+
+def test_arithmetic_matches_expansion():
+    s = series('sin(x)')
+    e = series('exp(x)')
+
+    assert list(e * e) == pytest.approx(list(series('exp(2*x)')))
+    assert list(e.compose(s)) == pytest.approx(list(series('exp(sin(x))')))
+    assert (2 * s - 1).truncate(3) == TaylorSeries([-1.0, 2.0, 0.0])
+
+def test_different_points():
+    with pytest.raises(ValueError):
+        series('sin(x)') + series('log(x)', 4, 1.0)
+
+    with pytest.raises(ValueError):
+        series('exp(x)').compose(series('cos(x)'))
+
+def test_numpy_scalars_keep_series():
+    np = pytest.importorskip('numpy')
+    s = series('sin(x)')
+
+    assert isinstance(np.float64(2.0) * s, TaylorSeries)
+    assert isinstance(np.float64(1.0) + s, TaylorSeries)
+
+def test_string_round_trip():
+    for s in [series('log(x)', 4, 1.0), series('cos(x)', 4, 3.14159), TaylorSeries([-1.0, 2.0])]:
+        assert parse(tokenize(str(s).split(' + O(')[0])) == s.to_tree()
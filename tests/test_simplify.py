@@ -0,0 +1,118 @@
+from symbolic.parser import *
+from symbolic.symb.manip import *
+from symbolic.symb.rules import RuleTable
+from symbolic.diff.calc import diff
+
+# (input, expected) pairs, taken from the if/elif simplify that preceded the rule table (with its
+# op. sim1, a / -1 and a ^ b * f(a ^ b) bugs fixed); expected results are written with infixify
+
+SIMPLIFY_CORPUS = [
+    ('x + 0', 'x'),
+    ('0 + x', 'x'),
+    ('x * 1', 'x'),
+    ('1 * x', 'x'),
+    ('x * 0', '0.0'),
+    ('0 / x', '0.0'),
+    ('x / 1', 'x'),
+    ('x / x', '1.0'),
+    ('x - x', '0.0'),
+    ('x - 0', 'x'),
+    ('2 + 3 * 4', '14.0'),
+    ('x + 2', '2.0 + x'),
+    ('x * 3', '3.0 * x'),
+    ('-(-x)', 'x'),
+    ('+x', 'x'),
+    ('-(x + y)', '-x - y'),
+    ('-(x - y)', 'y - x'),
+    ('-(2 * x)', '-2.0 * x'),
+    ('x - -y', 'x + y'),
+    ('x + -y', 'x - y'),
+    ('(x - y) + y', 'x'),
+    ('(x + y) - y', 'x'),
+    ('x + (y + z)', 'x + y + z'),
+    ('x + (y - z)', 'x + y - z'),
+    ('x - (y - z)', 'x + z - y'),
+    ('3 - (2 + x)', '1.0 - x'),
+    ('x * (y * z)', 'x * y * z'),
+    ('x * (y / z)', 'x * y * z ^ -1.0'),
+    ('(x / y) * y', 'x * y ^ -1.0 * y'),
+    ('x ^ 2 * x ^ 3', 'x ^ 5.0'),
+    ('x ^ 2 * x', 'x ^ 3.0'),
+    ('x * x ^ 2', 'x ^ 3.0'),
+    ('(y * x ^ 2) * x ^ 3', 'y * x ^ 5.0'),
+    ('(x ^ 2 * y) * x ^ 3', 'x ^ 5.0 * y'),
+    ('x / -1', '-x'),
+    ('(-x) / y', '-(x * y ^ -1.0)'),
+    ('x / -y', '-(x * y ^ -1.0)'),
+    ('x / (y / z)', 'x * (y * z ^ -1.0) ^ -1.0'),
+    ('6 / (2 * x)', '3.0 * x ^ -1.0'),
+    ('(x * y) / y', 'x'),
+    ('x ^ 3 / x', 'x ^ 2.0'),
+    ('x / y ^ 2', 'x * y ^ -2.0'),
+    ('x / y', 'x * y ^ -1.0'),
+    ('x ^ 0', '1.0'),
+    ('0 ^ x', '0.0'),
+    ('1 ^ x', '1.0'),
+    ('x ^ 1', 'x'),
+    ('(x ^ 2) ^ 3', 'x ^ 6.0'),
+    ('exp(log(x))', 'x'),
+    ('log(exp(x))', 'x'),
+    ('exp(2 * log(x))', 'x ^ 2.0'),
+    ('exp(-log(x))', 'x ^ -1.0'),
+    ('sin(0)', '0.0'),
+    ('cos(pi)', '-1.0'),
+    ('2 * pi', '6.283186'),
+    ('(-x) * y', '-(x * y)'),
+    ('x * -y', '-(x * y)'),
+    ('-1 * x', '-x'),
+    ('sin(x) / cos(pi)', '-sin(x)'),
+    ('x * y + 0 * z - 1 * w', 'x * y - w'),
+    ('(x + 1) ^ 2 * (x + 1) ^ -2', '1.0'),
+]
+
+DIFF_CORPUS = [
+    ('x ^ 2', '2.0 * x'),
+    ('sin(x) / x', '(cos(x) * x - sin(x)) * x ^ -2.0'),
+    ('x ^ -2', '-2.0 * x ^ -3.0'),
+    ('1 / (x ^ 2 + 1)', '(0.0 - 2.0 * x) * (1.0 + x ^ 2.0) ^ -2.0'),
+    ('log(x) ^ 3', '3.0 * x ^ -1.0 * log(x) ^ 2.0'),
+    ('exp(-x) * cos(2 * x)', '-(exp(-x) * cos(2.0 * x)) + -2.0 * exp(-x) * sin(2.0 * x)'),
+    ('tan(x)', 'sec(x) ^ 2.0'),
+    ('sec(x) * csc(x)', 'tan(x) * sec(x) * csc(x) - sec(x) * cot(x) * csc(x)'),
+    ('x * exp(x)', 'exp(x) + x * exp(x)'),
+    ('log(sin(x))', 'cos(x) * sin(x) ^ -1.0'),
+    ('cot(x) ^ 2', '-(2.0 * csc(x) ^ 2.0 * cot(x))'),
+    ('x ^ x', '(1.0 + log(x)) * x ^ x'),
+    ('(x + 1) / (x - 1)', '(x - 1.0 - (1.0 + x)) * (x - 1.0) ^ -2.0'),
+    ('sin(x) ^ 2 + cos(x) ^ 2', '2.0 * cos(x) * sin(x) - 2.0 * sin(x) * cos(x)'),
+    ('exp(x ^ 2)', '2.0 * x * exp(x ^ 2.0)'),
+]
+
+def check_corpus(corpus, fn):
+    failures = []
+
+    for expr, expected in corpus:
+        result = fn(parse(tokenize(expr)))
+
+        if result != parse(tokenize(expected)):
+            failures.append((expr, expected, infixify(result)))
+
+    assert failures == []
+
+def test_simplify_corpus():
+    check_corpus(SIMPLIFY_CORPUS, simplify)
+
+def test_diff_corpus():
+    check_corpus(DIFF_CORPUS, diff)
+
+def test_cyclic_rules_stop_at_limit():
+    table = RuleTable([('a + b', 'b + a')])
+    tree = parse(tokenize('x + y'))
+
+    assert table.rewrite(tree, 1001) == (('op', '+'), ('var', 'y'), ('var', 'x'))
+
+def test_user_rules():
+    table = RuleTable()
+    table.add('sin(a) ^ 2 + cos(a) ^ 2', '1')
+
+    assert table.rewrite(parse(tokenize('sin(x) ^ 2 + cos(x) ^ 2'))) == ('val', 1.0)